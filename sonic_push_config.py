@@ -13,21 +13,34 @@ Example:
 """
 
 import argparse
+import bisect
+import functools
 import os
+import pickle
 import sys
 import re
+import threading
 import time
 import getpass
+import ipaddress
 import socket
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
 import paramiko
 from paramiko import SSHClient, AutoAddPolicy
 import logging
 
+try:
+    import dns.resolver
+except ImportError:  # dnspython is optional - only needed for --dns-servers
+    dns = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    # threadName is the switch hostname inside _process_switch workers, so lines from
+    # concurrent sessions can be told apart
+    format='%(asctime)s - %(levelname)s - %(threadName)s - %(message)s',
     handlers=[
         logging.FileHandler('sonic_push_config.log'),
         logging.StreamHandler(sys.stdout)
@@ -35,56 +48,257 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def resolve_hostname(hostname, hosts_file='hosts.txt'):
+# Marks the start of each file's commands in a batched CLI session. Comment lines are
+# stripped from config files, so this can never collide with a real command.
+_FILE_SENTINEL = '# FILE: '
+
+# Extensions recognised as configuration files in a directory ('' means no extension)
+_CONFIG_EXTENSIONS = frozenset({'.txt', '.conf', '.cfg', '.config', ''})
+
+# A stripped config line that is a command: non-empty and not a # or ! comment
+_CONFIG_LINE_RE = re.compile(r'^[^#!\s]')
+
+# Switch name in a config filename: one character, "sw", then up to 8 digits (e.g. esw123)
+_SW_RE = re.compile(r'.sw\d{1,8}', re.IGNORECASE)
+
+# Output ending in a shell (`$`), exec (`>`/`#`) or config (`#`) prompt means the CLI is idle;
+# prompts never end in a newline, and \Z (unlike $) won't match before a trailing \n, so
+# banner lines ending in these characters do not match with either CRLF or LF endings
+_PROMPT_RE = re.compile(rb'[#>$][ \t]*\Z')
+
+# A prompt at the start of a line, e.g. "sonic(config-if-Ethernet0)# " - one follows every command
+_PROMPT_LINE_RE = re.compile(rb'^[^\s#>$]+[#>$]', re.MULTILINE)
+
+# Number of configuration commands sent to the CLI per write
+_CHUNK_SIZE = 50
+
+# Seconds allowed per command in a chunk, on top of a 10s base, before the chunk times out
+_COMMAND_TIMEOUT = 1
+
+# Error indicators in CLI output, matched against raw bytes so responses are only decoded on failure
+_ERR_RE = re.compile(rb'(?i)\b(?:error|invalid)\b')
+
+# Seconds to wait for the SSH port to accept a TCP connection before giving up on a switch
+_PREFLIGHT_TIMEOUT = 2
+
+# Parsed hosts files keyed by path: (mtime, ({lowercased hostname/alias: ip}, [format errors]))
+_HOSTS_CACHE = {}
+
+# Parsed hosts file persisted between runs, keyed by (format, path, mtime, size);
+# bump the format whenever the pickled structure changes
+_HOSTS_DISK_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'sonic_push_config', 'hosts.pkl')
+_HOSTS_DISK_CACHE_FORMAT = 2
+
+def _iter_hosts_entries(f):
+    """Yield (line_num, parts) for every non-empty, non-comment line of a hosts file"""
+    for line_num, line in enumerate(f, 1):
+        # Drop full-line and trailing comments and split on whitespace in one pass
+        parts = line.partition('#')[0].split()
+        
+        # Skip empty lines and comments
+        if not parts:
+            continue
+        
+        yield line_num, parts
+
+def _parse_hosts(hosts_file):
+    """
+    Parse and validate a hosts file in a single pass
+    
+    Returns:
+        tuple: (mapping, errors) - lowercased hostname/alias -> IP, and a list of
+        format problems found, one message per offending line
+    """
+    mapping = {}
+    errors = []
+    with open(hosts_file, 'r') as f:
+        # Parse line format: IP_ADDRESS HOSTNAME [ALIAS1] [ALIAS2] ...
+        for line_num, parts in _iter_hosts_entries(f):
+            if len(parts) < 2:
+                errors.append(f"hosts.txt line {line_num}: Invalid format - need at least IP and hostname")
+                continue
+            
+            ip_address = parts[0]
+            
+            # Basic IP address validation (IPv4 or IPv6); the entry is still used for
+            # resolution, matching how the file was treated before validation existed
+            try:
+                ipaddress.ip_address(ip_address)
+            except ValueError:
+                errors.append(f"hosts.txt line {line_num}: Invalid IP address '{ip_address}'")
+            
+            # First entry wins, matching the top-down lookup order of a hosts file
+            for alias in parts[1:]:
+                mapping.setdefault(alias.lower(), ip_address)
+    return mapping, errors
+
+def _load_hosts_disk_cache(hosts_file, stat):
+    """
+    Return the parsed hosts file from the on-disk cache if it matches the file's
+    path, mtime and size; otherwise parse the file and rewrite the cache
+    """
+    key = (_HOSTS_DISK_CACHE_FORMAT, os.path.abspath(hosts_file), stat.st_mtime, stat.st_size)
+    
+    try:
+        with open(_HOSTS_DISK_CACHE, 'rb') as f:
+            cached_key, parsed = pickle.load(f)
+        if cached_key == key:
+            logger.debug(f"Loaded hosts file '{hosts_file}' from cache {_HOSTS_DISK_CACHE}")
+            return parsed
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable hosts cache {_HOSTS_DISK_CACHE}: {e}")
+    
+    parsed = _parse_hosts(hosts_file)
+    
+    # Write atomically so a concurrent run never sees a partial pickle
+    tmp_path = f"{_HOSTS_DISK_CACHE}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(_HOSTS_DISK_CACHE), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((key, parsed), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _HOSTS_DISK_CACHE)
+    except OSError as e:
+        logger.debug(f"Could not write hosts cache {_HOSTS_DISK_CACHE}: {e}")
+    
+    return parsed
+
+def _load_hosts(hosts_file='hosts.txt'):
     """
-    Resolve hostname to IP address using hosts.txt file first, then system resolver
+    Load and validate hosts file, re-parsing only when the file changes
+    
+    Checks the in-process cache first, then the on-disk cache shared between runs,
+    so validation and resolution share a single parse.
     
     Args:
-        hostname (str): The hostname to resolve
-        hosts_file (str): Path to the hosts file (default: 'hosts.txt')
+        hosts_file (str): Path to the hosts file
     
     Returns:
-        str: IP address if resolved, original hostname if resolution fails
+        tuple: (mapping, errors) as returned by _parse_hosts (empty if file is missing)
     """
-    # First try to resolve using hosts.txt file
-    if os.path.exists(hosts_file):
-        try:
-            with open(hosts_file, 'r') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    
-                    # Skip empty lines and comments
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    # Parse line format: IP_ADDRESS HOSTNAME [ALIAS1] [ALIAS2] ...
-                    parts = line.split()
-                    if len(parts) < 2:
-                        continue
-                    
-                    ip_address = parts[0]
-                    hostnames = parts[1:]  # All remaining parts are hostnames/aliases
-                    
-                    # Check if our hostname matches any of the hostnames/aliases
-                    if hostname.lower() in [h.lower() for h in hostnames]:
-                        logger.info(f"Resolved {hostname} to {ip_address} via hosts.txt")
-                        return ip_address
-                        
-        except Exception as e:
-            logger.warning(f"Error reading hosts file '{hosts_file}': {e}")
-    else:
+    try:
+        stat = os.stat(hosts_file)
+    except OSError:
         logger.debug(f"Hosts file '{hosts_file}' not found, will use system resolver")
+        return {}, []
     
-    # If not found in hosts.txt, try system resolver
+    cached = _HOSTS_CACHE.get(hosts_file)
+    if cached and cached[0] == stat.st_mtime:
+        return cached[1]
+    
+    parsed = _load_hosts_disk_cache(hosts_file, stat)
+    
+    _HOSTS_CACHE[hosts_file] = (stat.st_mtime, parsed)
+    return parsed
+
+@functools.lru_cache(maxsize=None)
+def _sys_resolve(hostname):
+    """Resolve hostname via the system resolver, caching failures as None"""
     try:
-        ip_address = socket.gethostbyname(hostname)
-        if ip_address != hostname:  # If resolution was successful
-            logger.info(f"Resolved {hostname} to {ip_address} via system resolver")
-            return ip_address
+        return socket.gethostbyname(hostname)
     except socket.gaierror as e:
         logger.warning(f"Could not resolve hostname '{hostname}' via system resolver: {e}")
     except Exception as e:
         logger.warning(f"Unexpected error resolving hostname '{hostname}': {e}")
+    return None
+
+def _make_dns_resolver():
+    """
+    Create a dnspython Resolver, picking up search domains from /etc/resolv.conf when
+    it is usable; nameservers are always set explicitly by the caller
+    """
+    try:
+        return dns.resolver.Resolver()
+    except Exception as e:
+        # Missing or nameserver-less resolv.conf (common in containers)
+        logger.debug(f"Ignoring system resolver configuration: {e}")
+        return dns.resolver.Resolver(configure=False)
+
+def _dns_resolve(hostname, dns_servers, timeout=5):
+    """
+    Query every DNS server in parallel and return (ip_address, server) from the first
+    to answer, or (None, None) if none of them could resolve hostname
+    
+    Racing redundant servers cuts tail latency when one of them is slow or unreachable.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(dns_servers))
+    try:
+        futures = {}
+        for server in dns_servers:
+            resolver = _make_dns_resolver()
+            resolver.nameservers = [server]
+            resolver.lifetime = timeout
+            futures[executor.submit(resolver.resolve, hostname, 'A', search=True)] = server
+        
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    answer = future.result()
+                except Exception as e:
+                    logger.debug(f"DNS server {futures[future]} could not resolve '{hostname}': {e}")
+                    continue
+                # Cancel the losers that have not started yet
+                for loser in pending:
+                    loser.cancel()
+                return answer[0].address, futures[future]
+    finally:
+        # Don't wait for slower servers still in flight
+        executor.shutdown(wait=False)
+    
+    logger.warning(f"Could not resolve hostname '{hostname}' via DNS servers {', '.join(dns_servers)}")
+    return None, None
+
+@functools.lru_cache(maxsize=None)
+def _resolve(hostname, hosts_file, dns_servers=None):
+    """Return (ip_address, source) for hostname, or (None, None) if unresolved"""
+    # First try to resolve using hosts.txt file
+    try:
+        mapping, _ = _load_hosts(hosts_file)
+        ip_address = mapping.get(hostname.lower())
+        if ip_address:
+            return ip_address, 'hosts.txt'
+    except Exception as e:
+        logger.warning(f"Error reading hosts file '{hosts_file}': {e}")
+    
+    # Then race the configured DNS servers, if dnspython is available
+    if dns_servers and dns is not None:
+        try:
+            ip_address, server = _dns_resolve(hostname, dns_servers)
+        except Exception as e:
+            logger.warning(f"Error querying DNS servers for '{hostname}': {e}")
+            ip_address = None
+        if ip_address:
+            return ip_address, f"DNS server {server}"
+    
+    # If not found in hosts.txt, try system resolver
+    ip_address = _sys_resolve(hostname)
+    if ip_address and ip_address != hostname:  # If resolution was successful
+        return ip_address, 'system resolver'
+    
+    return None, None
+
+def resolve_hostname(hostname, hosts_file='hosts.txt', dns_servers=None):
+    """
+    Resolve hostname to IP address using hosts.txt file first, then the given DNS
+    servers (queried in parallel), then system resolver
+    
+    Results (including failures) are memoized per (hostname, hosts_file, dns_servers).
+    
+    Args:
+        hostname (str): The hostname to resolve
+        hosts_file (str): Path to the hosts file (default: 'hosts.txt')
+        dns_servers (tuple): DNS server addresses to query; requires dnspython (default: None)
+    
+    Returns:
+        str: IP address if resolved, original hostname if resolution fails
+    """
+    ip_address, source = _resolve(hostname, hosts_file, tuple(dns_servers) if dns_servers else None)
+    if ip_address:
+        logger.info(f"Resolved {hostname} to {ip_address} via {source}")
+        return ip_address
     
     # If all resolution methods fail, return original hostname
     logger.warning(f"Using original hostname '{hostname}' as IP resolution failed")
@@ -104,43 +318,16 @@ def validate_hosts_file(hosts_file='hosts.txt'):
         logger.info(f"Hosts file '{hosts_file}' not found - system resolver will be used")
         return True
     
-    valid = True
-    
     try:
-        with open(hosts_file, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                
-                # Skip empty lines and comments
-                if not line or line.startswith('#'):
-                    continue
-                
-                parts = line.split()
-                if len(parts) < 2:
-                    logger.warning(f"hosts.txt line {line_num}: Invalid format - need at least IP and hostname")
-                    valid = False
-                    continue
-                
-                ip_address = parts[0]
-                
-                # Basic IP address validation
-                try:
-                    socket.inet_aton(ip_address)  # Check if valid IPv4
-                except socket.error:
-                    try:
-                        socket.inet_pton(socket.AF_INET6, ip_address)  # Check if valid IPv6
-                    except socket.error:
-                        logger.warning(f"hosts.txt line {line_num}: Invalid IP address '{ip_address}'")
-                        valid = False
-                        continue
-                
-                hostnames = parts[1:]
-                logger.debug(f"hosts.txt entry: {ip_address} -> {', '.join(hostnames)}")
-    
+        _, errors = _load_hosts(hosts_file)
     except Exception as e:
         logger.error(f"Error validating hosts file '{hosts_file}': {e}")
         return False
     
+    for error in errors:
+        logger.warning(error)
+    valid = not errors
+    
     if valid:
         logger.info(f"Hosts file '{hosts_file}' validated successfully")
     else:
@@ -153,14 +340,11 @@ def extract_hostname_from_filename(filename):
     # Remove file extension and path
     basename = Path(filename).stem
     
-    # Pattern to match "sw" followed by up to 8 digits
-    sw_pattern = r'((.)sw\d{1,8})'
-    
     # Search for the sw pattern (case-insensitive)
-    match = re.search(sw_pattern, basename, re.IGNORECASE)
+    match = _SW_RE.search(basename)
     
     if match:
-        hostname = match.group(1).lower()  # Convert to lowercase for consistency
+        hostname = match.group(0).lower()  # Convert to lowercase for consistency
         logger.info(f"Found SW switch name: {hostname}")
         return hostname
     
@@ -169,21 +353,96 @@ def extract_hostname_from_filename(filename):
     logger.warning("Expected pattern: sw + up to 8 digits (e.g., esw123, esw12345678)")
     return basename
 
+def _read_until(shell, prompt_re=_PROMPT_RE, timeout=10):
+    """Read from an interactive shell until the output ends in a prompt or timeout expires"""
+    return _read_prompts(shell, 1, timeout, prompt_re)[0]
+
+def _read_prompts(shell, count, timeout, prompt_re=_PROMPT_RE):
+    """
+    Read from an interactive shell until count prompts have been seen and the output
+    ends in a prompt, so a batch of commands sent together is only returned once all
+    of them have completed
+    
+    Returns:
+        tuple: (output, complete) - complete is False if the timeout expired or the
+        channel closed before all prompts arrived
+    """
+    buf = bytearray()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not shell.recv_ready():
+            # recv_ready() only reports buffered data, so check for a dead channel
+            # (sonic-cli exited or the connection dropped) rather than wait out the deadline
+            if shell.closed or shell.exit_status_ready():
+                break
+            time.sleep(0.01)
+            continue
+        buf += _drain(shell)
+        if prompt_re.search(buf) and (count <= 1 or len(_PROMPT_LINE_RE.findall(buf)) >= count):
+            return bytes(buf), True
+    return bytes(buf), False
+
+def _drain(shell):
+    """Read everything currently available on the channel without waiting for more"""
+    buf = bytearray()
+    while shell.recv_ready():
+        buf += shell.recv(16384)
+    return bytes(buf)
+
+def _chunked(items, size):
+    """Yield successive lists of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _failed_segments(response, count):
+    """
+    Split the output of a batch of count commands at each prompt and yield
+    (index, segment) for every command whose output contains an error
+    
+    Each command's output runs from the previous prompt up to the prompt that
+    follows it, so an error is attributed to the command by counting prompts before it.
+    """
+    prompt_starts = [match.start() for match in _PROMPT_LINE_RE.finditer(response)]
+    failed = []
+    for match in _ERR_RE.finditer(response):
+        index = min(bisect.bisect_right(prompt_starts, match.start()), count - 1)
+        if index not in failed:
+            failed.append(index)
+    
+    for index in failed:
+        start = prompt_starts[index - 1] if 0 < index <= len(prompt_starts) else 0
+        end = prompt_starts[index] if index < len(prompt_starts) else len(response)
+        yield index, response[start:end]
+
+def read_config_commands(config_file_path):
+    """Read configuration commands from a file, skipping empty lines and # / ! comments"""
+    with open(config_file_path, 'r') as f:
+        # Stream the file rather than materializing it with readlines()
+        return [line for line in (raw.strip() for raw in f) if _CONFIG_LINE_RE.match(line)]
+
 class SONiCConfigApplier:
     """Class to handle SONiC switch configuration application"""
     
-    def __init__(self, hostname, username, password, port=22, timeout=30, hosts_file='hosts.txt'):
+    def __init__(self, hostname, username, password, port=22, timeout=30, hosts_file='hosts.txt', ip_address=None):
         self.hostname = hostname
-        # Resolve hostname to IP address
-        self.ip_address = resolve_hostname(hostname, hosts_file)
+        # Resolve hostname to IP address unless the caller already did
+        self.ip_address = ip_address or resolve_hostname(hostname, hosts_file)
         self.username = username
         self.password = password
         self.port = port
         self.timeout = timeout
         self.ssh_client = None
+        self.shell = None
         
     def connect(self):
         """Establish SSH connection to the switch"""
+        # Fail fast on hosts that aren't listening before paying for the full SSH timeout
+        try:
+            socket.create_connection((self.ip_address, self.port), timeout=_PREFLIGHT_TIMEOUT).close()
+        except OSError as e:
+            logger.error(f"TCP preflight to {self.hostname} ({self.ip_address}):{self.port} failed: {e}")
+            return False
+        
         try:
             self.ssh_client = SSHClient()
             self.ssh_client.set_missing_host_key_policy(AutoAddPolicy())
@@ -199,6 +458,17 @@ class SONiCConfigApplier:
                 allow_agent=False
             )
             logger.info("Successfully connected to switch")
+            
+            # Keep the session alive across long batches and backup transfers
+            self.ssh_client.get_transport().set_keepalive(15)
+            
+            # Open the interactive sonic-cli shell once and reuse it for every session
+            try:
+                self.open_cli_shell()
+            except Exception as e:
+                self.shell = None
+                logger.warning(f"Could not open SONiC CLI shell: {e}")
+            
             return True
             
         except paramiko.AuthenticationException:
@@ -211,13 +481,38 @@ class SONiCConfigApplier:
             logger.error(f"Connection error: {e}")
             return False
     
+    def open_cli_shell(self):
+        """Open an interactive shell and start sonic-cli in it"""
+        self.shell = self.ssh_client.invoke_shell()
+        self.shell.settimeout(10)
+        
+        # Wait for initial prompt
+        output = _read_until(self.shell).decode('utf-8')
+        logger.debug(f"Initial prompt: {output}")
+        
+        # Start sonic-cli
+        logger.info("Starting SONiC CLI session")
+        self.shell.send('sonic-cli\n')
+        
+        # Read the sonic-cli startup output
+        startup_output = _read_until(self.shell).decode('utf-8')
+        logger.debug(f"SONiC CLI startup: {startup_output}")
+    
     def disconnect(self):
         """Close SSH connection"""
+        if self.shell:
+            try:
+                # Exit sonic-cli before closing the shell
+                self.shell.send('exit\n')
+                self.shell.close()
+            except Exception as e:
+                logger.debug(f"Error closing SONiC CLI shell: {e}")
+            self.shell = None
         if self.ssh_client:
             self.ssh_client.close()
             logger.info("Disconnected from switch")
     
-    def execute_command(self, command, wait_time=1):
+    def execute_command(self, command):
         """Execute a single command on the switch"""
         try:
             stdin, stdout, stderr = self.ssh_client.exec_command(command)
@@ -231,7 +526,6 @@ class SONiCConfigApplier:
             if exit_status != 0 and error:
                 logger.warning(f"Command '{command}' returned error: {error}")
             
-            time.sleep(wait_time)  # Brief pause between commands
             return output, error, exit_status
             
         except Exception as e:
@@ -239,76 +533,92 @@ class SONiCConfigApplier:
             return None, str(e), -1
     
     def execute_sonic_cli_session(self, commands):
-        """Execute commands in a SONiC CLI session using an interactive shell"""
+        """Execute commands in the persistent SONiC CLI shell opened by connect()"""
         try:
-            # Create an interactive shell session
-            shell = self.ssh_client.invoke_shell()
-            shell.settimeout(10)
-            
-            # Wait for initial prompt
-            time.sleep(1)
-            output = shell.recv(1024).decode('utf-8')
-            logger.debug(f"Initial prompt: {output}")
-            
-            # Start sonic-cli
-            logger.info("Starting SONiC CLI session")
-            shell.send('sonic-cli\n')
-            time.sleep(2)
-            
-            # Read the sonic-cli startup output
-            startup_output = shell.recv(4096).decode('utf-8')
-            logger.debug(f"SONiC CLI startup: {startup_output}")
+            if self.shell is None:
+                raise RuntimeError("SONiC CLI shell is not open")
+            shell = self.shell
             
             # Enter configuration mode
             logger.info("Entering configuration mode")
             shell.send('configure\n')
-            time.sleep(1)
             
             # Read configure command output
-            config_output = shell.recv(1024).decode('utf-8')
+            config_output = _read_until(shell).decode('utf-8')
             logger.debug(f"Configure output: {config_output}")
             
-            # Execute configuration commands
+            # Resolve file markers into per-command labels for error attribution
+            entries = []
+            current_file = None
+            for command in commands:
+                if command.startswith(_FILE_SENTINEL):
+                    current_file = command[len(_FILE_SENTINEL):]
+                    continue
+                label = f"{current_file}: {command}" if current_file else command
+                entries.append((label, command))
+            
+            # Execute configuration commands, several per round-trip
             failed_commands = []
-            for i, command in enumerate(commands, 1):
-                logger.info(f"[{i}/{len(commands)}] Executing: {command}")
+            i = 0
+            for chunk in _chunked(entries, _CHUNK_SIZE):
+                for _, command in chunk:
+                    i += 1
+                    logger.info(f"[{i}/{len(entries)}] Executing: {command}")
                 
-                # Send command
-                shell.send(f'{command}\n')
-                time.sleep(0.5)  # Brief pause between commands
+                # Send the whole chunk at once
+                shell.send('\n'.join(command for _, command in chunk) + '\n')
                 
-                # Read response
+                # Read responses until every command in the chunk has returned to a prompt
                 try:
-                    response = shell.recv(2048).decode('utf-8')
-                    logger.debug(f"Response: {response}")
+                    timeout = 10 + _COMMAND_TIMEOUT * len(chunk)
+                    response, complete = _read_prompts(shell, len(chunk), timeout)
+                    logger.debug("Response: %r", response)
                     
-                    # Check for error indicators in response
-                    if 'Error' in response or 'error' in response or 'Invalid' in response:
-                        failed_commands.append((command, response.strip()))
-                        logger.error(f"Command failed: {command}")
-                        logger.error(f"Error response: {response.strip()}")
+                    # Check for error indicators in response, decoding only on failure
+                    for index, segment in _failed_segments(response, len(chunk)):
+                        label = chunk[index][0]
+                        error_text = segment.decode('utf-8', 'replace').strip()
+                        failed_commands.append((label, error_text))
+                        logger.error(f"Command failed: {label}")
+                        logger.error(f"Error response: {error_text}")
+                    
+                    if not complete:
+                        # Late output would be misattributed to later commands, so stop
+                        # here and leave the partial configuration unsaved
+                        reason = ("Channel closed" if shell.closed or shell.exit_status_ready()
+                                  else f"Timed out after {timeout}s")
+                        error = (f"{reason} waiting for commands "
+                                 f"{i - len(chunk) + 1}-{i} to complete; configuration not saved")
+                        logger.error(error)
+                        failed_commands.append((f"commands {i - len(chunk) + 1}-{i}", error))
+                        return False, failed_commands
                     
                 except Exception as e:
-                    logger.warning(f"Could not read response for command '{command}': {e}")
+                    # Same as a timeout: the shell is out of sync, so stop without saving
+                    error = (f"Could not read response for commands {i - len(chunk) + 1}-{i}: {e}; "
+                             f"configuration not saved")
+                    logger.error(error)
+                    failed_commands.append((f"commands {i - len(chunk) + 1}-{i}", error))
+                    return False, failed_commands
             
             # Exit configuration mode
             logger.info("Exiting configuration mode")
             shell.send('end\n')
-            time.sleep(1)
+            end_output = _read_until(shell).decode('utf-8')
+            logger.debug(f"End output: {end_output}")
             
             # Save configuration
             logger.info("Saving configuration to memory")
             shell.send('write memory\n')
-            time.sleep(2)
             
-            # Read final responses
+            # Read final responses - saving can take a while on larger configs
             try:
-                final_output = shell.recv(4096).decode('utf-8')
-                logger.debug(f"Final output: {final_output}")
+                final_output = _read_until(shell, timeout=30)
+                logger.debug("Final output: %r", final_output)
                 
                 # Check if write memory was successful
-                if 'Error' in final_output or 'error' in final_output:
-                    failed_commands.append(("write memory", final_output.strip()))
+                if _ERR_RE.search(final_output):
+                    failed_commands.append(("write memory", final_output.decode('utf-8', 'replace').strip()))
                     logger.error("Failed to save configuration")
                 else:
                     logger.info("Configuration saved successfully")
@@ -316,13 +626,7 @@ class SONiCConfigApplier:
             except Exception as e:
                 logger.warning(f"Could not read final output: {e}")
             
-            # Exit sonic-cli
-            shell.send('exit\n')
-            time.sleep(1)
-            
-            # Close the shell
-            shell.close()
-            
+            # Leave the shell at the sonic-cli exec prompt; disconnect() exits and closes it
             return len(failed_commands) == 0, failed_commands
             
         except Exception as e:
@@ -332,6 +636,9 @@ class SONiCConfigApplier:
     def execute_sonic_cli_single_command(self, commands):
         """Execute all commands in a single SONiC CLI session using heredoc or piping"""
         try:
+            # File markers are only meaningful to the interactive session
+            commands = [command for command in commands if not command.startswith(_FILE_SENTINEL)]
+            
             # Create a single command that pipes all commands to sonic-cli
             command_list = ['configure'] + commands + ['end', 'write memory', 'exit']
             
@@ -346,22 +653,22 @@ class SONiCConfigApplier:
             # Wait for command to complete
             exit_status = stdout.channel.recv_exit_status()
             
-            output = stdout.read().decode('utf-8').strip()
+            output = stdout.read()
             error = stderr.read().decode('utf-8').strip()
             
-            logger.debug(f"SONiC CLI output: {output}")
+            logger.debug("SONiC CLI output: %r", output)
             if error:
                 logger.debug(f"SONiC CLI stderr: {error}")
             
             # Parse output for errors
             failed_commands = []
-            output_lines = output.split('\n')
             
-            for line in output_lines:
-                if 'Error' in line or 'error' in line or 'Invalid' in line:
+            for line in output.splitlines():
+                if _ERR_RE.search(line):
                     # Try to match the error to a command
-                    failed_commands.append(("unknown_command", line.strip()))
-                    logger.error(f"Error in output: {line.strip()}")
+                    line = line.decode('utf-8', 'replace').strip()
+                    failed_commands.append(("unknown_command", line))
+                    logger.error(f"Error in output: {line}")
             
             if exit_status != 0:
                 logger.error(f"SONiC CLI session failed with exit status: {exit_status}")
@@ -385,22 +692,34 @@ class SONiCConfigApplier:
         return True
 
     def apply_config_file(self, config_file_path):
-        """Apply configuration from file using SONiC CLI session"""
-        try:
-            with open(config_file_path, 'r') as f:
-                config_lines = f.readlines()
+        """Apply configuration from a single file using SONiC CLI session"""
+        return self.apply_config_files([config_file_path])
+    
+    def apply_config_files(self, config_file_paths):
+        """Apply configuration from one or more files in a single SONiC CLI session"""
+        config_commands = []
+        command_count = 0
+        
+        for config_file_path in config_file_paths:
+            try:
+                file_commands = read_config_commands(config_file_path)
+            except FileNotFoundError:
+                logger.error(f"Configuration file not found: {config_file_path}")
+                return False, []
+            except Exception as e:
+                logger.error(f"Error reading configuration file {config_file_path}: {e}")
+                return False, []
             
             logger.info(f"Reading configuration from {config_file_path}")
-            logger.info(f"Found {len(config_lines)} configuration lines")
-            
-            # Filter out empty lines and comments
-            config_commands = []
-            for line in config_lines:
-                line = line.strip()
-                if line and not line.startswith('#') and not line.startswith('!'):
-                    config_commands.append(line)
+            logger.info(f"Found {len(file_commands)} configuration commands")
             
-            logger.info(f"Applying {len(config_commands)} configuration commands")
+            # Mark where this file's commands start so failures can be attributed back to it
+            config_commands.append(f"{_FILE_SENTINEL}{config_file_path}")
+            config_commands.extend(file_commands)
+            command_count += len(file_commands)
+        
+        try:
+            logger.info(f"Applying {command_count} configuration commands from {len(config_file_paths)} file(s)")
             
             # Try interactive session first, fall back to single command method
             logger.info("Attempting to use interactive SONiC CLI session")
@@ -415,9 +734,6 @@ class SONiCConfigApplier:
             
             return success, failed_commands
             
-        except FileNotFoundError:
-            logger.error(f"Configuration file not found: {config_file_path}")
-            return False, []
         except Exception as e:
             logger.error(f"Error applying configuration: {e}")
             return False, []
@@ -450,16 +766,11 @@ def get_config_files(config_path):
         config_files.append(config_path)
         logger.info(f"Single configuration file: {config_path}")
     elif os.path.isdir(config_path):
-        # Directory - get all files with common config extensions
-        config_extensions = ['.txt', '.conf', '.cfg', '.config']
-        
-        for file in os.listdir(config_path):
-            file_path = os.path.join(config_path, file)
-            if os.path.isfile(file_path):
-                # Check if file has a config extension or no extension
-                file_ext = os.path.splitext(file)[1].lower()
-                if file_ext in config_extensions or file_ext == '':
-                    config_files.append(file_path)
+        # Directory - get all files with common config extensions or no extension;
+        # scandir's DirEntry caches the file type, avoiding a stat per entry
+        with os.scandir(config_path) as entries:
+            config_files = [entry.path for entry in entries
+                            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in _CONFIG_EXTENSIONS]
         
         config_files.sort()  # Sort files alphabetically
         logger.info(f"Found {len(config_files)} configuration files in directory: {config_path}")
@@ -485,6 +796,63 @@ def process_multiple_switches(config_files):
     
     return switch_configs
 
+def _process_switch(hostname, target_files, args, username, password, ip_address=None):
+    """
+    Connect to a switch, optionally back it up, and apply its configuration files
+    
+    Runs in a worker thread; returns (hostname, result) for the caller to collect.
+    """
+    # Name the worker after its switch so every log line it writes identifies the switch
+    thread = threading.current_thread()
+    worker_name = thread.name
+    thread.name = hostname
+    
+    logger.info(f"\n{'='*60}")
+    logger.info(f"Processing switch: {hostname}")
+    logger.info(f"Configuration files: {len(target_files)}")
+    logger.info(f"{'='*60}")
+    
+    # Create configuration applier for this switch
+    applier = SONiCConfigApplier(hostname, username, password, args.port, args.timeout, args.hosts_file,
+                                 ip_address=ip_address)
+    
+    try:
+        # Connect to switch
+        if not applier.connect():
+            logger.error(f"Failed to connect to switch {hostname}")
+            return hostname, {"success": False, "error": "Connection failed"}
+        
+        # Create backup if requested
+        if args.backup:
+            backup_filename = f"{hostname}_backup_{int(time.time())}.conf"
+            if not applier.backup_current_config(backup_filename):
+                logger.warning(f"Failed to create backup for {hostname}, continuing anyway...")
+        
+        # Apply configuration files for this switch
+        logger.info(f"Applying configuration from {len(target_files)} file(s) to {hostname}")
+        
+        switch_success, all_failed_commands = applier.apply_config_files(target_files)
+        
+        if switch_success:
+            logger.info(f"All configuration files applied successfully to {hostname}!")
+            return hostname, {"success": True, "files_processed": len(target_files)}
+        
+        logger.error(f"Configuration for {hostname} completed with {len(all_failed_commands)} errors:")
+        for cmd, error in all_failed_commands:
+            logger.error(f"  {cmd}: {error}")
+        return hostname, {
+            "success": False, 
+            "error": f"{len(all_failed_commands)} command failures",
+            "failed_commands": all_failed_commands
+        }
+            
+    except Exception as e:
+        logger.error(f"Unexpected error processing {hostname}: {e}")
+        return hostname, {"success": False, "error": str(e)}
+    finally:
+        applier.disconnect()
+        thread.name = worker_name
+
 def main():
     parser = argparse.ArgumentParser(
         description='Apply configuration file to Dell SONiC switch',
@@ -496,6 +864,8 @@ Examples:
   python sonic_push_config.py /path/to/configs/ --hostname esw456
   python sonic_push_config.py switch_configs/ --backup
   python sonic_push_config.py esw123.txt --hosts-file /path/to/custom_hosts.txt
+  python sonic_push_config.py configs/ --parallel 4
+  python sonic_push_config.py configs/ --dns-servers 10.0.0.53,10.0.1.53
         '''
     )
     
@@ -515,8 +885,22 @@ Examples:
     parser.add_argument('--validate-hosts', action='store_true',
                        help='Validate hosts file format and exit')
     
+    parser.add_argument('--parallel', type=int, default=8,
+                       help='Maximum number of switches to configure concurrently (default: 8)')
+    parser.add_argument('--dns-servers',
+                       help='Comma-separated DNS servers to query in parallel for hostnames not in the hosts file '
+                            '(requires dnspython)')
+    
     args = parser.parse_args()
     
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+    
+    if args.dns_servers:
+        args.dns_servers = tuple(server.strip() for server in args.dns_servers.split(',') if server.strip())
+        if dns is None:
+            logger.warning("dnspython is not installed - ignoring --dns-servers and using system resolver")
+    
     # Validate hosts file if requested
     if args.validate_hosts:
         logger.info(f"Validating hosts file: {args.hosts_file}")
@@ -544,10 +928,14 @@ Examples:
     # Group configuration files by switch hostname
     switch_configs = process_multiple_switches(config_files)
     
+    # Resolve each switch exactly once while listing it; the dry-run and the
+    # appliers below reuse resolved_ips instead of resolving again
+    resolved_ips = {}
+    
     logger.info(f"Found configuration files for {len(switch_configs)} switches:")
     for hostname, files in switch_configs.items():
         # Show resolved IP for each hostname
-        resolved_ip = resolve_hostname(hostname, args.hosts_file)
+        resolved_ip = resolved_ips[hostname] = resolve_hostname(hostname, args.hosts_file, args.dns_servers)
         ip_info = f" -> {resolved_ip}" if resolved_ip != hostname else ""
         logger.info(f"  {hostname}{ip_info}: {len(files)} file(s)")
         for file in files:
@@ -580,7 +968,7 @@ Examples:
         
         total_commands = 0
         for hostname, target_files in target_switches.items():
-            resolved_ip = resolve_hostname(hostname, args.hosts_file)
+            resolved_ip = resolved_ips[hostname]
             ip_info = f" ({resolved_ip})" if resolved_ip != hostname else ""
             logger.info(f"\nSwitch: {hostname}{ip_info}")
             logger.info(f"Configuration files: {len(target_files)}")
@@ -589,11 +977,7 @@ Examples:
             for config_file in target_files:
                 logger.info(f"Configuration file: {config_file}")
                 try:
-                    with open(config_file, 'r') as f:
-                        lines = f.readlines()
-                    
-                    config_commands = [line.strip() for line in lines 
-                                     if line.strip() and not line.startswith('#') and not line.startswith('!')]
+                    config_commands = read_config_commands(config_file)
                     
                     logger.info(f"  Commands from {config_file} ({len(config_commands)}):")
                     for i, cmd in enumerate(config_commands, 1):
@@ -610,75 +994,45 @@ Examples:
         logger.info(f"\nGrand total commands to be applied: {total_commands}")
         sys.exit(0)
     
-    # Process each switch
+    # Process switches concurrently - each worker owns its own SSH session
     overall_success = True
     switch_results = {}
     
-    for hostname, target_files in target_switches.items():
-        logger.info(f"\n{'='*60}")
-        logger.info(f"Processing switch: {hostname}")
-        logger.info(f"Configuration files: {len(target_files)}")
-        logger.info(f"{'='*60}")
-        
-        # Create configuration applier for this switch
-        applier = SONiCConfigApplier(hostname, username, password, args.port, args.timeout, args.hosts_file)
-        
+    logger.info(f"Processing {len(target_switches)} switch(es) with up to {args.parallel} in parallel")
+    
+    with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+        futures = {
+            executor.submit(_process_switch, hostname, target_files, args, username, password,
+                            resolved_ips[hostname]): hostname
+            for hostname, target_files in target_switches.items()
+        }
         try:
-            # Connect to switch
-            if not applier.connect():
-                logger.error(f"Failed to connect to switch {hostname}")
-                switch_results[hostname] = {"success": False, "error": "Connection failed"}
-                overall_success = False
-                continue
-            
-            # Create backup if requested
-            if args.backup:
-                backup_filename = f"{hostname}_backup_{int(time.time())}.conf"
-                if not applier.backup_current_config(backup_filename):
-                    logger.warning(f"Failed to create backup for {hostname}, continuing anyway...")
-            
-            # Apply configuration files for this switch
-            logger.info(f"Applying configuration from {len(target_files)} file(s) to {hostname}")
-            
-            switch_success = True
-            all_failed_commands = []
-            
-            for i, config_file in enumerate(target_files, 1):
-                logger.info(f"Processing file {i}/{len(target_files)}: {config_file}")
-                success, failed_commands = applier.apply_config_file(config_file)
-                
-                if not success:
-                    switch_success = False
-                    all_failed_commands.extend(failed_commands)
-                    logger.error(f"Configuration file {config_file} completed with errors")
-                else:
-                    logger.info(f"Configuration file {config_file} applied successfully")
-            
-            if switch_success:
-                logger.info(f"All configuration files applied successfully to {hostname}!")
-                switch_results[hostname] = {"success": True, "files_processed": len(target_files)}
-            else:
-                logger.error(f"Configuration for {hostname} completed with {len(all_failed_commands)} errors:")
-                for cmd, error in all_failed_commands:
-                    logger.error(f"  {cmd}: {error}")
-                switch_results[hostname] = {
-                    "success": False, 
-                    "error": f"{len(all_failed_commands)} command failures",
-                    "failed_commands": all_failed_commands
-                }
-                overall_success = False
-                
+            for future in as_completed(futures):
+                hostname, result = future.result()
+                switch_results[hostname] = result
+                if not result["success"]:
+                    overall_success = False
         except KeyboardInterrupt:
             logger.info("Operation cancelled by user")
-            switch_results[hostname] = {"success": False, "error": "Cancelled by user"}
             overall_success = False
-            break
-        except Exception as e:
-            logger.error(f"Unexpected error processing {hostname}: {e}")
-            switch_results[hostname] = {"success": False, "error": str(e)}
-            overall_success = False
-        finally:
-            applier.disconnect()
+            
+            # Only switches whose worker had not started are untouched
+            running = []
+            for future, hostname in futures.items():
+                if hostname in switch_results:
+                    continue
+                if future.cancel():
+                    switch_results[hostname] = {"success": False, "error": "Cancelled by user"}
+                else:
+                    running.append(future)
+            
+            # Switches already in progress keep pushing config, so report their real outcome
+            in_progress = sum(1 for future in running if not future.done())
+            if in_progress:
+                logger.info(f"Waiting for {in_progress} switch(es) already in progress to finish")
+            for future in running:
+                hostname, result = future.result()
+                switch_results[hostname] = result
     
     # Print summary
     logger.info(f"\n{'='*60}")